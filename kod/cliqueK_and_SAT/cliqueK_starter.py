@@ -1,53 +1,146 @@
 #!/usr/bin/env python3
 
 import os
+import sys
+import mmap
+import logging
+import logging.handlers
+import json
+import hashlib
+import signal
 import subprocess
 import time
 import re
 from pathlib import Path
 import argparse
-from typing import Tuple, Dict, List, Set
+import threading
+import weakref
+from array import array
+from collections import Counter
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Tuple, Dict, List, Set, Iterator
+
+# Verbose output of the solvers running for a file; records are buffered and
+# written to stdout once per file, so solver timings are not interleaved with writes
+logger = logging.getLogger('cliqueK')
+_log_buffer = logging.handlers.MemoryHandler(capacity=1 << 16, flushLevel=logging.CRITICAL + 1,
+                                             target=logging.StreamHandler(sys.stdout))
+logger.addHandler(_log_buffer)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+# DIMACS graph lines, matched over the raw file bytes
+_RE_GRAPH_HEADER = re.compile(rb'^[ \t]*p[ \t]+(?:edge|col)[ \t]+(\d+)[ \t]+(\d+)', re.M)
+_RE_GRAPH_EDGE = re.compile(rb'^[ \t]*e[ \t]+(\d+)[ \t]+(\d+)', re.M)
+
+# Solver output patterns, checked once per solver run
+_RE_UNSAT = re.compile(r'No solutions found|\b0 solutions\b|\[Number of solutions:\s*0\]')
+_RE_CLIQUE_SIZE = re.compile(r'Clique size:\s*(\d+)')
+_RE_MAX_CLIQUE = re.compile(r'Maximum clique:\s*(\d+)')
+_RE_SOLUTION = re.compile(r'Solution.*?(\d+)')
+_RE_SIZE_EQ = re.compile(r'size=(\d+)')
+
+# Each result row is fsync'd to the output file and its filename then appended
+# to this sidecar log, so an interrupted run resumes from the last committed row
+_CHECKPOINT_SUFFIX = ".processed.jsonl"
+
+class _VertexIds(dict):
+    """Maps vertex tokens (bytes) from a DIMACS file to ints, converting each distinct token once."""
+    def __missing__(self, token: bytes) -> int:
+        vertex = self[token] = int(token)
+        return vertex
+
+# Suffix of the binary edge list cached next to a graph file with --graph-cache:
+# vertex and edge counts as two int64, then the endpoints as int32 pairs
+_GRAPH_CACHE_SUFFIX = ".edges.bin"
+
+# Edges per streamed chunk of URS code (roughly 64 KB of text)
+_URS_CHUNK_EDGES = 1600
+
+# How often a running URSA process checks whether it has been cancelled
+_CANCEL_POLL_SECONDS = 0.05
+
+# Statistics labels written by write_final_statistics and the stats key each one sets
+_STAT_LABELS = {
+    'cliques found:': 'found',
+    'not found:': 'not_found',
+    'timeout:': 'timeout',
+    'error:': 'error',
+    'skipped:': 'skipped',
+}
+
+# Statuses of URSA (and reduction) runs skipped because Cliquer's maximum
+# clique size already decides K: a clique of size >= K exists (lower bound),
+# or the clique number is below K (upper bound). Both count as skipped.
+_SKIPPED_BY_LOWER_BOUND = "SKIPPED_LB"
+_SKIPPED_BY_UPPER_BOUND = "SKIPPED_UB"
+
+# URSA prints its solution summary last, so only this many trailing
+# characters of its output are inspected
+_OUTPUT_TAIL_CHARS = 4096
 
 def is_sat_output(stdout: str) -> bool:
     """Check if URSA output indicates a solution was found."""
-    if "--> Solution" in stdout:
+    tail = stdout[-_OUTPUT_TAIL_CHARS:]
+    if "--> Solution" in tail:
         return True
-    elif "[Solving time:" in stdout and "[Formula size:" in stdout:
-        if "0 solutions" not in stdout and "No solutions" not in stdout:
+    elif "[Solving time:" in tail and "[Formula size:" in tail:
+        if "0 solutions" not in tail and "No solutions" not in tail:
             return True
     return False
 
 def is_unsat_output(stdout: str) -> bool:
     """Check if URSA output indicates no solution was found."""
-    if "No solutions found" in stdout or re.search(r'\b0 solutions\b', stdout):
-        return True
-    if re.search(r'\[Number of solutions:\s*0\]', stdout):
-        return True
-    return False
+    return _RE_UNSAT.search(stdout[-_OUTPUT_TAIL_CHARS:]) is not None
+
+# DIMACS comment blocks are often several hundred bytes long, so the header
+# sniff reads this many bytes to reach the 'p edge' line
+_HEADER_SNIFF_BYTES = 1000
+
+def _has_graph_header(filepath: str) -> bool:
+    """Check whether the beginning of a file looks like a DIMACS graph."""
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            first_bytes = os.read(fd, _HEADER_SNIFF_BYTES)
+        finally:
+            os.close(fd)
+    except OSError:
+        return False
+    return b'p edge' in first_bytes or b'p col' in first_bytes or b'e ' in first_bytes
+
+def _iter_graph_files(graph_dir: str) -> Iterator[str]:
+    """Lazily yield paths of .clq/.txt files under a directory, recursively."""
+    try:
+        entries = os.scandir(graph_dir)
+    except OSError:
+        return  # Unreadable directories are skipped, as os.walk did
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_graph_files(entry.path)
+            elif entry.name.endswith(('.clq', '.txt')):
+                yield entry.path
 
 def find_graph_files(graph_dir: str) -> List[str]:
     """Find all DIMACS graph files (.clq, .txt) in a directory (sorted)."""
-    graph_files = []
-    for root, dirs, files in os.walk(graph_dir):
-        for file in files:
-            if file.endswith('.clq') or file.endswith('.txt'):
-                filepath = os.path.join(root, file)
-                try:
-                    with open(filepath, 'r') as f:
-                        first_lines = f.read(1000)
-                        if 'p edge' in first_lines or 'p col' in first_lines or 'e ' in first_lines:
-                            graph_files.append(filepath)
-                except:
-                    continue
+    # Header checks are pure I/O, so threads overlap them well
+    with ThreadPoolExecutor() as executor:
+        candidates = list(_iter_graph_files(graph_dir))
+        graph_files = [filepath for filepath, is_graph in zip(candidates, executor.map(_has_graph_header, candidates))
+                       if is_graph]
     graph_files.sort()
     return graph_files
 
+_CATEGORIES = frozenset({'BROCK', 'KELLER', 'MANN', 'P_HAT', 'SAN', 'SANR', 'C-FAT', 'HAMMING', 'JOHNSON'})
+
 def extract_category(graph_file: str) -> str:
     """Extract category from parent directory name."""
-    path_parts = Path(graph_file).parts
-    for part in path_parts:
-        if part.upper() in ['BROCK', 'KELLER', 'MANN', 'P_HAT', 'SAN', 'SANR', 'C-FAT', 'HAMMING', 'JOHNSON']:
-            return part.upper()
+    for part in Path(graph_file).parts:
+        part_upper = part.upper()
+        if part_upper in _CATEGORIES:
+            return part_upper
     return "UNKNOWN"
 
 def write_header(f, solver_template_name: str, reduction_template_name: str = None, save_urs: bool = False):
@@ -94,8 +187,9 @@ def write_header(f, solver_template_name: str, reduction_template_name: str = No
         if reduction_template_name:
             header_parts.append(f"{'Reduction File':<25}")
 
-    f.write(" | ".join(header_parts) + "\n")
-    f.write("-" * (sum(len(part) for part in header_parts) + 3 * (len(header_parts) - 1)) + "\n")
+    header_line = " | ".join(header_parts)
+    f.write(header_line + "\n")
+    f.write("-" * len(header_line) + "\n")
 
 def update_stats(stats: Dict, result: Dict, has_reduction: bool = False):
     """Update cumulative statistics with a single benchmark result."""
@@ -109,6 +203,8 @@ def update_stats(stats: Dict, result: Dict, has_reduction: bool = False):
         stats['ursa']['not_found'] += 1
     elif ursa_status_key == 'timeout':
         stats['ursa']['timeout'] += 1
+    elif ursa_status_key.startswith('skipped'):
+        stats['ursa']['skipped'] += 1
     else:
         stats['ursa']['error'] += 1
     
@@ -130,6 +226,8 @@ def update_stats(stats: Dict, result: Dict, has_reduction: bool = False):
             stats['reduction']['not_found'] += 1
         elif red_status_key == 'timeout':
             stats['reduction']['timeout'] += 1
+        elif red_status_key.startswith('skipped'):
+            stats['reduction']['skipped'] += 1
         else:
             stats['reduction']['error'] += 1
 
@@ -141,7 +239,10 @@ def write_final_statistics(f, stats: Dict, has_reduction: bool = False):
     f.write(f"Cliques found:     {stats['ursa']['found']}\n")
     f.write(f"Not found:         {stats['ursa']['not_found']}\n")
     f.write(f"Timeout:           {stats['ursa']['timeout']}\n")
-    f.write(f"Error:             {stats['ursa']['error']}\n\n")
+    f.write(f"Error:             {stats['ursa']['error']}\n")
+    if stats['ursa']['skipped']:
+        f.write(f"Skipped:           {stats['ursa']['skipped']}\n")
+    f.write("\n")
     
     f.write(f"Cliquer Results:\n")
     f.write(f"Cliques found:     {stats['cliquer']['found']}\n")
@@ -153,7 +254,10 @@ def write_final_statistics(f, stats: Dict, has_reduction: bool = False):
         f.write(f"Cliques found:     {stats['reduction']['found']}\n")
         f.write(f"Not found:         {stats['reduction']['not_found']}\n")
         f.write(f"Timeout:           {stats['reduction']['timeout']}\n")
-        f.write(f"Error:             {stats['reduction']['error']}\n\n")
+        f.write(f"Error:             {stats['reduction']['error']}\n")
+        if stats['reduction']['skipped']:
+            f.write(f"Skipped:           {stats['reduction']['skipped']}\n")
+        f.write("\n")
     
     f.write(f"Total instances:   {stats['total']}\n")
     f.write(f"Completed: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -174,6 +278,22 @@ def filter_files(graph_files: List[str], processed_files: Set[str], continue_mod
     print(f"Will process {len(files_to_process)} files")
     return files_to_process
 
+def checkpoint_path(output_file: str) -> str:
+    """Path of the processed-files log kept next to a results file."""
+    return output_file + _CHECKPOINT_SUFFIX
+
+def format_time(seconds: float, width: int) -> str:
+    """Format a solver time column; rows reused under --dedupe have no time ('-')."""
+    if seconds is None:
+        return f"{'-':<{width}}"
+    return f"{seconds:<{width}.6f}"
+
+def append_durably(f, text: str):
+    """Append text to an open file and fsync it before returning."""
+    f.write(text)
+    f.flush()
+    os.fsync(f.fileno())
+
 def prepare_output_file(output_file: str, continue_mode: bool) -> str:
     """Prepare output file for writing (clear old final statistics if continuing)."""
     file_mode = "a" if continue_mode and os.path.exists(output_file) else "w"
@@ -183,18 +303,51 @@ def prepare_output_file(output_file: str, continue_mode: bool) -> str:
         final_stats_index = next((i for i, line in enumerate(existing_lines) if "FINAL STATISTICS:" in line), -1)
         if final_stats_index > 0:
             existing_lines = existing_lines[:final_stats_index]
+        # Drop a row torn by an interrupted write
+        if existing_lines and not existing_lines[-1].endswith("\n"):
+            existing_lines.pop()
         with open(output_file, "w") as f:
             f.writelines(existing_lines)
     return file_mode
 
+def greedy_clique_bounds(num_vertices: int, edges: List[Tuple[int, int]]) -> Tuple[int, int]:
+    """Return a lower bound (size of a greedily built clique) and an upper bound (max degree + 1) on the clique number."""
+    neighbours = {v: set() for v in range(1, num_vertices + 1)}
+    for v1, v2 in edges:
+        if v1 != v2:
+            neighbours.setdefault(v1, set()).add(v2)
+            neighbours.setdefault(v2, set()).add(v1)
+    if not neighbours:
+        return 0, 0
+    
+    # Take vertices by decreasing degree, keeping each one adjacent to the whole clique so far
+    candidates = set(neighbours)
+    clique_size = 0
+    for v in sorted(neighbours, key=lambda v: len(neighbours[v]), reverse=True):
+        if v in candidates:
+            clique_size += 1
+            candidates &= neighbours[v]
+    return clique_size, max(map(len, neighbours.values())) + 1
+
+def graph_key(num_vertices: int, edges: List[Tuple[int, int]]) -> str:
+    """Identify a graph by its vertex count and edge set, independently of edge order and direction."""
+    canonical_edges = sorted({(v1, v2) if v1 <= v2 else (v2, v1) for v1, v2 in edges})
+    edges_hash = hashlib.blake2b(array('q', chain.from_iterable(canonical_edges)).tobytes(), digest_size=16)
+    return f"{num_vertices}:{edges_hash.hexdigest()}"
+
 class URSACliqueBenchmark:
     def __init__(self, ursa_path="./ursa", cliquer_path="cliquer", timeout=120, 
                  solver_template=None, reduction_template=None, save_urs=False, 
                  urs_output_dir="urs_files", reduction_output_dir="reduction_files",
-                 continue_mode=False, output_file="clique_benchmark_results.txt"):
+                 continue_mode=False, output_file="clique_benchmark_results.txt", jobs=1,
+                 target_k=None, skip_ursa_on_cliquer_unsat=False, hard_timeout=None,
+                 skip_ursa_on_lower_bound=True, lb_cache_file=None, graph_cache=False,
+                 find_max_k=False, dedupe=False):
         self.ursa_path = ursa_path
         self.cliquer_path = cliquer_path
         self.timeout = timeout
+        # Solvers get SIGTERM at timeout and SIGKILL at hard_timeout
+        self.hard_timeout = hard_timeout if hard_timeout is not None else timeout * 1.1
         
         if solver_template is None:
             raise ValueError("Solver template is required")
@@ -202,6 +355,11 @@ class URSACliqueBenchmark:
         
         self.reduction_template = reduction_template
         
+        # Template logic appended after every graph's URS code, encoded once
+        # here instead of being concatenated and encoded again for each file
+        self._template_suffixes = {template: f"\n{template}\n".encode()
+                                   for template in (solver_template, reduction_template) if template is not None}
+        
         self.save_urs = save_urs
         self.urs_output_dir = urs_output_dir
         self.reduction_output_dir = reduction_output_dir
@@ -211,19 +369,64 @@ class URSACliqueBenchmark:
         self.processed_files = set()
         self.existing_stats = None
         self.existing_header = None
+        self.jobs = max(1, jobs)
+        self.target_k = target_k
+        self.skip_ursa_on_cliquer_unsat = skip_ursa_on_cliquer_unsat
+        self.skip_ursa_on_lower_bound = skip_ursa_on_lower_bound
+        self.graph_cache = graph_cache
+        self.find_max_k = find_max_k
+        
+        # First result for each distinct graph, reused for duplicates under other names
+        self.dedupe = dedupe
+        self._results_by_graph = {}
+        self._results_lock = threading.Lock()
+        
+        # Cliquer's maximum clique sizes by graph, shared across runs via lb_cache_file;
+        # only used (and the file only read and written) when one of the skip rules is on
+        self.decide_by_cliquer = skip_ursa_on_cliquer_unsat or (skip_ursa_on_lower_bound and target_k is not None)
+        self.lb_cache_file = lb_cache_file
+        self._lb_cache = self._load_lb_cache()
+        self._lb_cache_lock = threading.Lock()
+        
+        # Cancel events of the solvers currently running; all of them are set
+        # when the run is interrupted, so their process groups are stopped
+        self._cancel_events = weakref.WeakSet()
+        self._cancel_lock = threading.Lock()
+        self._cancelled = False
         
         if self.save_urs:
             os.makedirs(self.urs_output_dir, exist_ok=True)
             if self.reduction_template:
                 os.makedirs(self.reduction_output_dir, exist_ok=True)
     
+    def _load_lb_cache(self) -> Dict[str, int]:
+        """Load cached maximum clique sizes, or start an empty cache."""
+        if not self.decide_by_cliquer or self.lb_cache_file is None or not os.path.exists(self.lb_cache_file):
+            return {}
+        try:
+            with open(self.lb_cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load clique size cache {self.lb_cache_file}: {e}")
+            return {}
+    
+    def save_lb_cache(self):
+        """Persist cached maximum clique sizes for later runs."""
+        if not self.decide_by_cliquer or self.lb_cache_file is None:
+            return
+        with self._lb_cache_lock:
+            tmp_file = self.lb_cache_file + ".tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self._lb_cache, f)
+            os.replace(tmp_file, self.lb_cache_file)
+    
     def _initialize_empty_stats(self) -> Dict:
         """Initialize an empty statistics dictionary."""
         return {
             'total': 0,
-            'ursa': {'found': 0, 'not_found': 0, 'timeout': 0, 'error': 0},
+            'ursa': {'found': 0, 'not_found': 0, 'timeout': 0, 'error': 0, 'skipped': 0},
             'cliquer': {'found': 0, 'timeout': 0, 'error': 0},
-            'reduction': {'found': 0, 'not_found': 0, 'timeout': 0, 'error': 0}
+            'reduction': {'found': 0, 'not_found': 0, 'timeout': 0, 'error': 0, 'skipped': 0}
         }
     
     def _extract_header_lines(self, data_lines: List[str]) -> List[str]:
@@ -251,7 +454,7 @@ class URSACliqueBenchmark:
         current_context = None
         
         for line in stats_lines:
-            line_stripped = line.strip()
+            line_lower = line.lower()
             
             if "URSA Results:" in line:
                 current_context = "ursa"
@@ -267,28 +470,22 @@ class URSACliqueBenchmark:
                     pass
                 current_context = None
             
-            if current_context and ("found:" in line.lower() or "timeout:" in line.lower() or "error:" in line.lower()):
-                self._parse_stat_line(stats, current_context, line)
+            if current_context:
+                self._parse_stat_line(stats, current_context, line, line_lower)
         
         return stats
     
-    def _parse_stat_line(self, stats: Dict, context: str, line: str):
+    def _parse_stat_line(self, stats: Dict, context: str, line: str, line_lower: str = None):
         """Parse a single statistics line and update the stats dictionary."""
-        try:
-            if "cliques found:" in line.lower():
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['found'] = int(num_str)
-            elif "not found:" in line.lower():
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['not_found'] = int(num_str)
-            elif "timeout:" in line.lower():
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['timeout'] = int(num_str)
-            elif "error:" in line.lower():
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['error'] = int(num_str)
-        except (ValueError, IndexError):
-            pass
+        if line_lower is None:
+            line_lower = line.lower()
+        for label, key in _STAT_LABELS.items():
+            if label in line_lower:
+                try:
+                    stats[context][key] = int(line.split(':', 1)[1].strip())
+                except (ValueError, IndexError):
+                    pass
+                return
     
     def _print_existing_results_summary(self, processed_files: Set[str], existing_stats: Dict):
         """Print summary of loaded existing results."""
@@ -306,25 +503,24 @@ class URSACliqueBenchmark:
             return processed_files, existing_stats, header_lines
         
         try:
+            # Single streaming pass: result rows until final statistics begin, then the statistics
+            data_lines = []
+            stats_lines = []
             with open(self.output_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Find where final statistics begin
-            final_stats_index = -1
-            for i, line in enumerate(lines):
-                if "FINAL STATISTICS:" in line:
-                    final_stats_index = i
-                    break
+                for line in f:
+                    if "FINAL STATISTICS:" in line:
+                        stats_lines.append(line)
+                        stats_lines.extend(f)
+                        break
+                    data_lines.append(line)
             
-            if final_stats_index == -1:
-                data_lines = lines
-            else:
-                data_lines = lines[:final_stats_index]
-                stats_lines = lines[final_stats_index:]
+            if stats_lines:
                 existing_stats = self._parse_statistics_section(stats_lines)
             
             header_lines = self._extract_header_lines(data_lines)
-            processed_files = self._extract_processed_filenames(data_lines)
+            processed_files = self._load_checkpoint(checkpoint_path(self.output_file))
+            if processed_files is None:
+                processed_files = self._extract_processed_filenames(data_lines)
             self._print_existing_results_summary(processed_files, existing_stats)
             
         except Exception as e:
@@ -332,6 +528,54 @@ class URSACliqueBenchmark:
         
         return processed_files, existing_stats, header_lines
     
+    def _config_snapshot(self) -> Dict:
+        """Settings that must match for continued results to be comparable."""
+        return {
+            'solver_template': hashlib.sha256(self.solver_template.encode()).hexdigest(),
+            'reduction_template': (hashlib.sha256(self.reduction_template.encode()).hexdigest()
+                                   if self.reduction_template else None),
+            'timeout': self.timeout,
+        }
+    
+    def _load_checkpoint(self, checkpoint_file: str):
+        """Read processed filenames from the sidecar log, or None if there is no log."""
+        if not os.path.exists(checkpoint_file):
+            return None
+        
+        processed_files = set()
+        with open(checkpoint_file, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # last entry torn by an interrupted write
+                if 'file' in entry:
+                    processed_files.add(entry['file'])
+                elif 'config' in entry and entry['config'] != self._config_snapshot():
+                    print(f"Warning: {checkpoint_file} was written with a different template or timeout; "
+                          f"continued results may not be comparable")
+        return processed_files
+    
+    def _open_checkpoint(self, output_file: str, file_mode: str):
+        """Open the sidecar log for appending, starting it with the config snapshot if new."""
+        checkpoint_file = checkpoint_path(output_file)
+        if file_mode == "a" and os.path.exists(checkpoint_file):
+            checkpoint = open(checkpoint_file, "a+")
+            # Terminate an entry torn by an interrupted write so the next one parses
+            if checkpoint.tell() > 0:
+                checkpoint.seek(checkpoint.tell() - 1)
+                if checkpoint.read(1) != "\n":
+                    append_durably(checkpoint, "\n")
+            return checkpoint
+        
+        # New log; a results file from before the log existed seeds it with its rows
+        checkpoint = open(checkpoint_file, "w")
+        entries = [json.dumps({'config': self._config_snapshot()})]
+        if file_mode == "a":
+            entries.extend(json.dumps({'file': name}) for name in sorted(self.processed_files))
+        append_durably(checkpoint, "\n".join(entries) + "\n")
+        return checkpoint
+    
     def load_or_init_stats(self) -> Tuple[Set[str], Dict, List[str]]:
         """Load existing results if continue mode is enabled, otherwise initialize fresh stats."""
         if self.continue_mode:
@@ -339,95 +583,232 @@ class URSACliqueBenchmark:
         else:
             return set(), self._initialize_empty_stats(), []
 
-    def parse_dimacs_graph(self, content: str) -> Tuple[int, int, List[Tuple[int, int]]]:
+    def parse_dimacs_graph(self, content) -> Tuple[int, int, List[Tuple[int, int]]]:
         """Parse DIMACS graph format (p edge format). Returns (num_vertices, num_edges, edges)."""
-        lines = content.strip().split('\n')
+        if isinstance(content, str):
+            content = content.encode()
+        
         num_vertices = 0
         num_edges = 0
-        edges = []
+        header_match = _RE_GRAPH_HEADER.search(content)
+        if header_match:
+            num_vertices = int(header_match.group(1))
+            num_edges = int(header_match.group(2))
         
-        for line in lines:
-            line = line.strip()
-            
-            # Skip comments and empty lines
-            if not line or line.startswith('c'):
-                continue
-                
-            # Header line
-            if line.startswith('p edge') or line.startswith('p col'):
-                parts = line.split()
-                num_vertices = int(parts[2])
-                num_edges = int(parts[3])
-                continue
-                
-            # Edge lines
-            if line.startswith('e '):
-                parts = line.split()
-                if len(parts) >= 3:
-                    v1 = int(parts[1])
-                    v2 = int(parts[2])
-                    edges.append((v1, v2))
-                    
+        # One regex pass over the whole buffer instead of a Python loop per line;
+        # each distinct vertex token is converted to int once and then looked up
+        vertex_ids = _VertexIds()
+        edges = [(vertex_ids[v1], vertex_ids[v2]) for v1, v2 in _RE_GRAPH_EDGE.findall(content)]
         return num_vertices, num_edges, edges
+    
+    def load_dimacs_graph(self, graph_file: str) -> Tuple[int, int, List[Tuple[int, int]]]:
+        """Memory-map a DIMACS graph file and parse it. Returns (num_vertices, num_edges, edges)."""
+        if self.graph_cache:
+            graph = self._read_graph_cache(graph_file)
+            if graph is not None:
+                return graph
+        
+        with open(graph_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                graph = self.parse_dimacs_graph(b'')
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    graph = self.parse_dimacs_graph(mm)
+        
+        if self.graph_cache:
+            self._write_graph_cache(graph_file, graph)
+        return graph
+    
+    def _read_graph_cache(self, graph_file: str):
+        """Load a graph from its binary cache, or return None if the cache is missing or stale."""
+        cache_file = graph_file + _GRAPH_CACHE_SUFFIX
+        try:
+            if os.stat(cache_file).st_mtime_ns < os.stat(graph_file).st_mtime_ns:
+                return None
+            with open(cache_file, 'rb') as f:
+                counts = array('q')
+                counts.fromfile(f, 2)
+                endpoints = array('i')
+                endpoints.frombytes(f.read())
+        except (OSError, EOFError, ValueError):
+            return None
+        return counts[0], counts[1], list(zip(endpoints[0::2], endpoints[1::2]))
+    
+    def _write_graph_cache(self, graph_file: str, graph: Tuple[int, int, List[Tuple[int, int]]]):
+        """Store a parsed graph in its binary cache; failures only cost a re-parse next time."""
+        num_vertices, num_edges, edges = graph
+        cache_file = graph_file + _GRAPH_CACHE_SUFFIX
+        tmp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                array('q', (num_vertices, num_edges)).tofile(f)
+                array('i', chain.from_iterable(edges)).tofile(f)
+            os.replace(tmp_file, cache_file)
+        except (OSError, OverflowError):
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
 
-    def generate_urs_code(self, num_vertices: int, edges: List[Tuple[int, int]], template: str) -> str:
-        """Generate URS code for Max Clique problem."""
+    def build_graph_prefix(self, num_vertices: int, edges: List[Tuple[int, int]]) -> List[bytes]:
+        """Generate the template-independent part of the URS code (vertex count and adjacency matrix) as encoded chunks."""
         # Create adjacency matrix
-        urs_code = f"""nN = {num_vertices};
-
+        urs_code = f"nN = {num_vertices};\n"
+        if self.target_k is not None:
+            urs_code += f"nK = {self.target_k};\n"
+        urs_code += """
 // Initialize adjacency matrix
-for(i=0; i<nN; i++) {{
-    for(j=0; j<nN; j++) {{
+for(i=0; i<nN; i++) {
+    for(j=0; j<nN; j++) {
         bEdge[i][j] = false;
-    }}
-}}
+    }
+}
 
 // Add edges (convert from 1-indexed to 0-indexed)
 """
         
-        # Add each edge (convert from 1-indexed to 0-indexed)
-        for v1, v2 in edges:
-            v1_idx = v1 - 1  # Convert to 0-indexed
-            v2_idx = v2 - 1  # Convert to 0-indexed
-            urs_code += f"bEdge[{v1_idx}][{v2_idx}] = true;\n"
-            urs_code += f"bEdge[{v2_idx}][{v1_idx}] = true;\n"  # Graph is undirected
+        # 0-indexed vertex labels, converted to text once per vertex instead of
+        # subtracting and formatting both endpoints again for every edge
+        max_vertex = max(num_vertices, max(map(max, edges), default=0))
+        labels = [str(v - 1) for v in range(max_vertex + 1)]
         
-        # Add template logic
-        urs_code += "\n" + template + "\n"
-        return urs_code
+        # Add each edge in both directions (graph is undirected) as one compact
+        # line, split into chunks that can be streamed to URSA as soon as they are written
+        chunks = [urs_code.encode()]
+        for start in range(0, len(edges), _URS_CHUNK_EDGES):
+            chunks.append("".join(
+                f"bEdge[{labels[v1]}][{labels[v2]}]=true;bEdge[{labels[v2]}][{labels[v1]}]=true;\n"
+                for v1, v2 in edges[start:start + _URS_CHUNK_EDGES]
+            ).encode())
+        return chunks
+    
+    def iter_urs_chunks(self, graph_prefix: List[bytes], template: str) -> Iterator[bytes]:
+        """Yield the encoded URS code for a graph prefix followed by the template logic."""
+        suffix = self._template_suffixes.get(template)
+        if suffix is None:
+            suffix = f"\n{template}\n".encode()
+        yield from graph_prefix
+        yield suffix
+    
+    def combine_urs_code(self, graph_prefix: List[bytes], template: str) -> str:
+        """Append template logic to a graph prefix built by build_graph_prefix."""
+        return b"".join(self.iter_urs_chunks(graph_prefix, template)).decode()
     
-    def save_urs_code(self, urs_code: str, original_filename: str, output_dir: str, suffix: str = "") -> str:
-        """Save the generated URS code to a file and return the file path."""
+    def generate_urs_code(self, num_vertices: int, edges: List[Tuple[int, int]], template: str) -> str:
+        """Generate URS code for Max Clique problem."""
+        return self.combine_urs_code(self.build_graph_prefix(num_vertices, edges), template)
+    
+    def _write_urs(self, dst, urs_code):
+        """Write URS code (a string or encoded chunks) to a binary file or pipe."""
+        if isinstance(urs_code, str):
+            urs_code = [urs_code.encode()]
+        for chunk in urs_code:
+            dst.write(chunk)
+    
+    def save_urs_code(self, urs_code, original_filename: str, output_dir: str, suffix: str = "") -> str:
+        """Save the generated URS code (a string or encoded chunks) to a file and return the file path."""
         base_name = Path(original_filename).stem
         urs_filename = f"{base_name}{suffix}.urs"
         urs_filepath = os.path.join(output_dir, urs_filename)
         
         try:
-            with open(urs_filepath, 'w') as f:
-                f.write(urs_code)
+            with open(urs_filepath, 'wb') as f:
+                self._write_urs(f, urs_code)
             return urs_filepath
         except Exception as e:
             print(f"Error saving URS code to {urs_filepath}: {e}")
             return None
     
-    def run_ursa(self, urs_code: str, debug_name: str = "") -> Tuple[str, float, int]:
-        """Run URSA with a given URS code. Returns (status, time, clique_size)."""
+    def _stop_process(self, process: subprocess.Popen):
+        """Stop a timed-out solver: SIGTERM its process group, then SIGKILL it at the hard timeout."""
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        try:
+            process.communicate(timeout=max(0.0, self.hard_timeout - self.timeout))
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            process.communicate()
+    
+    def _feed_stdin(self, stdin, urs_code):
+        """Write URS code to URSA's stdin and close it."""
+        try:
+            self._write_urs(stdin, urs_code)
+        except (BrokenPipeError, OSError, ValueError):
+            pass  # URSA exited or was killed before reading all of its input
+        finally:
+            try:
+                stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+    
+    def _new_cancel_event(self) -> threading.Event:
+        """Create a cancel event for one file's solvers; it is also set by cancel_all."""
+        cancel = threading.Event()
+        with self._cancel_lock:
+            self._cancel_events.add(cancel)
+            if self._cancelled:
+                cancel.set()
+        return cancel
+    
+    def cancel_all(self):
+        """Stop every running solver and make solvers started later stop at once."""
+        with self._cancel_lock:
+            self._cancelled = True
+            for cancel in self._cancel_events:
+                cancel.set()
+    
+    def _communicate_until_cancelled(self, process: subprocess.Popen, cancel: threading.Event):
+        """Like communicate(timeout=self.timeout), but return None if cancel is set while the process runs."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                return process.communicate(timeout=max(0.0, min(_CANCEL_POLL_SECONDS, remaining)))
+            except subprocess.TimeoutExpired:
+                if cancel.is_set():
+                    return None
+                if remaining <= _CANCEL_POLL_SECONDS:
+                    raise
+    
+    def run_ursa(self, urs_code, debug_name: str = "", cancel: threading.Event = None) -> Tuple[str, float, int]:
+        """Run URSA with a given URS code (a string or encoded chunks). Returns (status, time, clique_size)."""
         try:
             start_time = time.time()
+            # One URSA process per run: URSA reads a single program from stdin until
+            # EOF and has no interactive mode, so a process cannot be reused
             process = subprocess.Popen(
                 [self.ursa_path, "-q"], 
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True
+                start_new_session=True
             )
             
+            # Stream the code from a writer thread so URSA starts parsing early;
+            # stdin is detached so communicate() only collects the output
+            stdin, process.stdin = process.stdin, None
+            writer = threading.Thread(target=self._feed_stdin, args=(stdin, urs_code), daemon=True)
+            writer.start()
+            
             try:
-                stdout, stderr = process.communicate(input=urs_code, timeout=self.timeout)
+                if cancel is None:
+                    output = process.communicate(timeout=self.timeout)
+                else:
+                    output = self._communicate_until_cancelled(process, cancel)
             except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
+                self._stop_process(process)
+                writer.join()
                 return "TIMEOUT", self.timeout, 0
+            if output is None:
+                self._stop_process(process)
+                writer.join()
+                return "SKIPPED", time.time() - start_time, 0
+            stdout, stderr = output
+            writer.join()
+            stdout = stdout.decode(errors='replace')
 
             end_time = time.time()
             actual_elapsed = end_time - start_time
@@ -437,11 +818,11 @@ for(i=0; i<nN; i++) {{
                 clique_size = 0
                 
                 # Example: if template outputs "Clique size: X"
-                size_match = re.search(r'Clique size:\s*(\d+)', stdout)
+                size_match = _RE_CLIQUE_SIZE.search(stdout)
                 if not size_match:
-                    size_match = re.search(r'Maximum clique:\s*(\d+)', stdout)
+                    size_match = _RE_MAX_CLIQUE.search(stdout)
                 if not size_match:
-                    size_match = re.search(r'Solution.*?(\d+)', stdout)
+                    size_match = _RE_SOLUTION.search(stdout)
                 
                 if size_match:
                     clique_size = int(size_match.group(1))
@@ -459,7 +840,7 @@ for(i=0; i<nN; i++) {{
             print(f"URSA error: {e}")
             return "ERROR", 0.0, 0
 
-    def run_cliquer(self, graph_file: str) -> Tuple[str, float, int]:
+    def run_cliquer(self, graph_file: str, cancel: threading.Event = None) -> Tuple[str, float, int]:
         """Run Cliquer on a graph file. Returns (status, time, clique_size)."""
         try:
             start_time = time.time()
@@ -468,10 +849,18 @@ for(i=0; i<nN; i++) {{
                 [self.cliquer_path, graph_file],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True
+                text=True,
+                start_new_session=True
             )
             
-            stdout, stderr = process.communicate(timeout=self.timeout)
+            if cancel is None:
+                output = process.communicate(timeout=self.timeout)
+            else:
+                output = self._communicate_until_cancelled(process, cancel)
+            if output is None:
+                self._stop_process(process)
+                return "SKIPPED", time.time() - start_time, 0
+            stdout, stderr = output
             end_time = time.time()
             
             elapsed_time = end_time - start_time
@@ -480,7 +869,7 @@ for(i=0; i<nN; i++) {{
             clique_size = 0
             
             # Look for "size=X" pattern from cliquer output
-            size_match = re.search(r'size=(\d+)', stdout)
+            size_match = _RE_SIZE_EQ.search(stdout)
             if size_match:
                 clique_size = int(size_match.group(1))
             
@@ -492,67 +881,218 @@ for(i=0; i<nN; i++) {{
                 return "ERROR", elapsed_time, 0
                 
         except subprocess.TimeoutExpired:
-            process.kill()
+            self._stop_process(process)
             return "TIMEOUT", self.timeout, 0
         except Exception as e:
             print(f"Cliquer error: {e}")
             return "ERROR", 0.0, 0
     
-    def run_with_template(self, num_vertices: int, edges: List[Tuple[int, int]], 
-                         template: str, save_dir: str = None, suffix: str = "",
+    def run_with_template(self, graph_prefix: List[bytes], template: str, save_dir: str = None, suffix: str = "",
                          label: str = "URSA", verbose: bool = False, 
-                         original_filename: str = None) -> Tuple[str, float, int]:
-        """Generate URS code, optionally save it, run URSA solver, and return (status, elapsed_time, clique_size)."""
-        urs_code = self.generate_urs_code(num_vertices, edges, template)
-
+                         original_filename: str = None, cancel: threading.Event = None,
+                         k: int = None) -> Tuple[str, float, int]:
+        """Combine the graph prefix with a template, optionally save it, run URSA solver, and return (status, elapsed_time, clique_size).
+        If k is given, it is set as nK ahead of the graph (and added to the saved file name)."""
+        if k is not None:
+            graph_prefix = [f"nK = {k};\n".encode(), *graph_prefix]
+            suffix = f"{suffix}_K{k}"
+            label = f"{label} K={k}"
+        
         if save_dir and original_filename:
-            filepath = self.save_urs_code(urs_code, original_filename, save_dir, suffix)
+            filepath = self.save_urs_code(self.iter_urs_chunks(graph_prefix, template), original_filename, save_dir, suffix)
             if filepath and verbose:
-                print(f"{label} code saved to: {filepath}")
+                logger.info(f"{label} code saved to: {filepath}")
 
-        status, elapsed, clique_size = self.run_ursa(urs_code, label if verbose else "")
+        status, elapsed, clique_size = self.run_ursa(self.iter_urs_chunks(graph_prefix, template), label if verbose else "", cancel)
         if verbose:
-            print(f"{label}: {status} (size={clique_size}, time={elapsed:.6f}s)")
+            logger.info(f"{label}: {status} (size={clique_size}, time={elapsed:.6f}s)")
 
         return status, elapsed, clique_size
     
+    def _find_max_k_binsearch(self, graph_prefix: List[bytes], lo: int, hi: int, verbose: bool = False,
+                              original_filename: str = None, cancel: threading.Event = None) -> Tuple[str, float, int]:
+        """Binary-search the largest K in [lo, hi] with a K-clique, given that a lo-clique exists. Returns (status, time, K)."""
+        def probe(k):
+            return self.run_with_template(
+                graph_prefix,
+                template=self.solver_template,
+                save_dir=self.urs_output_dir if self.save_urs else None,
+                label="URSA",
+                verbose=verbose,
+                original_filename=original_filename,
+                cancel=cancel,
+                k=k
+            )
+        
+        total_time = 0.0
+        found_by_ursa = False
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            status, elapsed, _ = probe(mid)
+            total_time += elapsed
+            
+            if status == "FOUND":
+                lo = mid
+                found_by_ursa = True
+            elif status == "NOT_FOUND":
+                hi = mid - 1
+            else:
+                return status, total_time, 0
+        
+        if not found_by_ursa:
+            # Only the bounds gave lo (e.g. the greedy clique already matches
+            # Cliquer's answer), so URSA itself still has to find a lo-clique
+            # before the row may report a URSA result
+            status, elapsed, _ = probe(max(lo, 1))
+            total_time += elapsed
+            return status, total_time, (lo if status == "FOUND" else 0)
+        return "FOUND", total_time, lo
+    
+    def _find_max_k(self, graph_prefix: List[bytes], num_vertices: int, edges: List[Tuple[int, int]],
+                    cliquer_future, verbose: bool = False, original_filename: str = None,
+                    cancel: threading.Event = None) -> Tuple[str, float, int]:
+        """Find the clique number with URSA, searching between a greedy clique and Cliquer's answer."""
+        lo, hi = greedy_clique_bounds(num_vertices, edges)
+        cliquer_status, _, cliquer_clique = cliquer_future.result()
+        if cliquer_status == "FOUND":
+            hi = max(lo, min(hi, cliquer_clique))
+        if verbose:
+            logger.info(f"URSA: searching K in [{lo}, {hi}]")
+        return self._find_max_k_binsearch(graph_prefix, lo, hi, verbose, original_filename, cancel)
+    
+    def _ursa_skip(self, max_clique: int) -> Tuple[str, str]:
+        """Return (status, reason) if Cliquer's maximum clique size already decides K, or None."""
+        # Cliquer reports the maximum clique, so it decides K either way
+        # (without an explicit K, only an empty answer rules out every clique)
+        k = 1 if self.target_k is None else self.target_k
+        if max_clique < k:
+            if self.skip_ursa_on_cliquer_unsat:
+                return _SKIPPED_BY_UPPER_BOUND, f"Cliquer found no clique of size {k}"
+        elif self.skip_ursa_on_lower_bound and self.target_k is not None:
+            return _SKIPPED_BY_LOWER_BOUND, f"Cliquer found a clique of size {max_clique} >= {k}"
+        return None
+    
     def benchmark_file(self, graph_file: str, verbose: bool = True) -> Dict[str, any]:
         """Benchmark a single graph file with URSA, Cliquer, and optionally URSA Reduction."""
+        try:
+            return self._benchmark_file(graph_file, verbose)
+        finally:
+            _log_buffer.flush()
+    
+    def _benchmark_file(self, graph_file: str, verbose: bool) -> Dict[str, any]:
+        """Body of benchmark_file; verbose output is buffered until it returns."""
         file_name = os.path.basename(graph_file)
         if self.continue_mode and file_name in self.processed_files:
             if verbose:
-                print(f"Skipping already processed: {file_name}")
+                logger.info(f"Skipping already processed: {file_name}")
             return None
         
         if verbose:
-            print(f"Testing: {file_name}")
+            logger.info(f"Testing: {file_name}")
         
-        # Read and parse graph file
-        try:
-            with open(graph_file, 'r') as f:
-                graph_content = f.read()
-            num_vertices, num_edges, edges = self.parse_dimacs_graph(graph_content)
-            if verbose:
-                print(f"Parsed: {num_vertices} vertices, {num_edges} edges")
-        except Exception as e:
-            if verbose:
-                print(f"Error parsing {graph_file}: {e}")
-            return None
+        # Run URSA, Cliquer and the optional reduction side by side (portfolio),
+        # so the wall time per file is the slowest solver instead of their sum
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Cliquer reads the graph file itself, so it is launched before the
+            # graph is parsed for URSA and its start-up overlaps the parse
+            cancel_cliquer = self._new_cancel_event()
+            cliquer_future = executor.submit(self.run_cliquer, graph_file, cancel_cliquer)
+            
+            # Read and parse graph file
+            try:
+                num_vertices, num_edges, edges = self.load_dimacs_graph(graph_file)
+                if verbose:
+                    logger.info(f"Parsed: {num_vertices} vertices, {num_edges} edges")
+            except Exception as e:
+                if verbose:
+                    logger.info(f"Error parsing {graph_file}: {e}")
+                cancel_cliquer.set()
+                return None
+            
+            skip = graph_hash = None
+            if self.decide_by_cliquer or self.dedupe:
+                graph_hash = graph_key(num_vertices, edges)
+            
+            if self.dedupe:
+                with self._results_lock:
+                    previous = self._results_by_graph.get(graph_hash)
+                if previous is not None:
+                    cancel_cliquer.set()
+                    if verbose:
+                        logger.info(f"Same graph as {previous['file']}, reusing its results")
+                    # Statuses and clique sizes carry over, but nothing was timed
+                    # for this file, so its row gets no solver times
+                    result = dict(previous, file=file_name, source='dedup', dedup_of=previous['file'])
+                    for time_key in ('ursa_time', 'cliquer_time', 'reduction_time'):
+                        if time_key in result:
+                            result[time_key] = None
+                    return result
+            
+            if self.decide_by_cliquer:
+                # A cached Cliquer answer that already decides K skips URSA outright
+                max_clique = self._lb_cache.get(graph_hash)
+                if max_clique is not None:
+                    skip = self._ursa_skip(max_clique)
+            
+            # Otherwise URSA runs alongside Cliquer and is cancelled if Cliquer decides K first
+            cancel_ursa = self._new_cancel_event()
+            ursa_future = reduction_future = None
+            if skip is None:
+                # The adjacency part of the URS code is shared by the solver and reduction runs
+                graph_prefix = self.build_graph_prefix(num_vertices, edges)
+                if self.find_max_k:
+                    ursa_future = executor.submit(
+                        self._find_max_k, graph_prefix, num_vertices, edges, cliquer_future, verbose,
+                        original_filename=file_name,
+                        cancel=cancel_ursa
+                    )
+                else:
+                    ursa_future = executor.submit(
+                        self.run_with_template,
+                        graph_prefix,
+                        template=self.solver_template,
+                        save_dir=self.urs_output_dir if self.save_urs else None,
+                        label="URSA",
+                        verbose=verbose,
+                        original_filename=file_name,
+                        cancel=cancel_ursa
+                    )
+                if self.reduction_template:
+                    reduction_future = executor.submit(
+                        self.run_with_template,
+                        graph_prefix,
+                        template=self.reduction_template,
+                        save_dir=self.reduction_output_dir if self.save_urs else None,
+                        suffix="_reduction",
+                        label="Reduction",
+                        verbose=verbose,
+                        original_filename=file_name,
+                        cancel=cancel_ursa
+                    )
+            
+            cliquer_status, cliquer_time, cliquer_clique = cliquer_future.result()
+            if self.decide_by_cliquer and cliquer_status in ("FOUND", "NOT_FOUND"):
+                with self._lb_cache_lock:
+                    self._lb_cache[graph_hash] = cliquer_clique
+                if skip is None:
+                    skip = self._ursa_skip(cliquer_clique)
+                    if skip is not None:
+                        cancel_ursa.set()
+            if ursa_future is not None:
+                ursa_status, ursa_time, ursa_clique = ursa_future.result()
+            else:
+                ursa_status, ursa_time, ursa_clique = "SKIPPED", 0.0, 0
+            # A run cancelled (or never started) because Cliquer decided K is
+            # reported with the status saying which bound decided it, and with
+            # no time, whether or not it had already been running for a while
+            skip_status = skip[0] if skip is not None else None
+            if skip_status and ursa_status == "SKIPPED":
+                ursa_status, ursa_time = skip_status, 0.0
         
-        # Run URSA
-        ursa_status, ursa_time, ursa_clique = self.run_with_template(
-            num_vertices, edges,
-            template=self.solver_template,
-            save_dir=self.urs_output_dir if self.save_urs else None,
-            label="URSA",
-            verbose=verbose,
-            original_filename=file_name
-        )
-        
-        # Run Cliquer
-        cliquer_status, cliquer_time, cliquer_clique = self.run_cliquer(graph_file)
         if verbose:
-            print(f"Cliquer: {cliquer_status} (size={cliquer_clique}, time={cliquer_time:.6f}s)")
+            logger.info(f"Cliquer: {cliquer_status} (size={cliquer_clique}, time={cliquer_time:.6f}s)")
+            if skip_status and ursa_status == skip_status:
+                logger.info(f"URSA: {skip_status} ({skip[1]})")
         
         result = {
             'file': file_name,
@@ -566,23 +1106,74 @@ for(i=0; i<nN; i++) {{
             'cliquer_clique': cliquer_clique
         }
         
-        # Run URSA Reduction if template provided
         if self.reduction_template:
-            reduction_status, reduction_time, reduction_clique = self.run_with_template(
-                num_vertices, edges,
-                template=self.reduction_template,
-                save_dir=self.reduction_output_dir if self.save_urs else None,
-                suffix="_reduction",
-                label="Reduction",
-                verbose=verbose,
-                original_filename=file_name
-            )
+            if reduction_future is not None:
+                reduction_status, reduction_time, reduction_clique = reduction_future.result()
+            else:
+                reduction_status, reduction_time, reduction_clique = "SKIPPED", 0.0, 0
+            if skip_status and reduction_status == "SKIPPED":
+                reduction_status, reduction_time = skip_status, 0.0
             result['reduction_status'] = reduction_status
             result['reduction_time'] = reduction_time
             result['reduction_clique'] = reduction_clique
         
+        if self.dedupe:
+            with self._results_lock:
+                self._results_by_graph.setdefault(graph_hash, result)
         return result
     
+    def _timed_benchmark_file(self, graph_file: str) -> Tuple[Dict[str, any], float]:
+        """Benchmark a single graph file quietly and return (result, wall_time)."""
+        start_time = time.time()
+        result = self.benchmark_file(graph_file, verbose=False)
+        return result, time.time() - start_time
+    
+    def _write_result_row(self, f, checkpoint, graph_file: str, result: Dict[str, any]):
+        """Append a result row to the results file, then log the file in the checkpoint."""
+        category = extract_category(graph_file)
+        
+        # Write result line
+        line_parts = [
+            f"{category:<12}",
+            f"{result['file']:<35}",
+            f"{result['vertices']:<9}",
+            f"{result['edges']:<8}",
+            f"{result['ursa_status']:<12}",
+            f"{result['cliquer_status']:<12}"
+        ]
+        
+        if self.reduction_template:
+            line_parts.append(f"{result['reduction_status']:<12}")
+        
+        line_parts.extend([
+            format_time(result['ursa_time'], 10),
+            format_time(result['cliquer_time'], 12)
+        ])
+        
+        if self.reduction_template:
+            line_parts.append(format_time(result['reduction_time'], 10))
+        
+        line_parts.extend([
+            f"{result['ursa_clique']:<12}",
+            f"{result['cliquer_clique']:<12}"
+        ])
+        
+        if self.reduction_template:
+            line_parts.append(f"{result['reduction_clique']:<12}")
+        
+        if self.save_urs:
+            urs_filename = os.path.basename(result.get('urs_file', ''))
+            line_parts.append(f"{urs_filename:<25}")
+            
+            if self.reduction_template:
+                reduction_filename = os.path.basename(result.get('reduction_file', ''))
+                line_parts.append(f"{reduction_filename:<25}")
+        
+        # Row first, then its log entry: a crash in between re-runs the file
+        # rather than losing its row
+        append_durably(f, " | ".join(line_parts) + "\n")
+        append_durably(checkpoint, json.dumps({'file': result['file']}) + "\n")
+    
     def benchmark_directory(self, graph_dir: str, output_file: str = "clique_benchmark_results.txt"):
         """Benchmark all graph files in a directory, with support for continue mode."""
         
@@ -603,80 +1194,63 @@ for(i=0; i<nN; i++) {{
         
         file_mode = prepare_output_file(output_file, self.continue_mode)
         
-        with open(output_file, file_mode) as f:
+        with open(output_file, file_mode) as f, self._open_checkpoint(output_file, file_mode) as checkpoint:
             if file_mode == "w":
                 solver_name = "solver_template"
                 reduction_name = "reduction_template" if self.reduction_template else None
                 write_header(f, solver_name, reduction_name, self.save_urs)
             
-            # Benchmark each file
-            for i, graph_file in enumerate(files_to_process, 1):
-                print(f"Testing: {os.path.basename(graph_file)}, {i}/{len(files_to_process)} ...", end='', flush=True)
-                
-                start_time = time.time()
-                result = self.benchmark_file(graph_file, verbose=False)
-                end_time = time.time()
-                
-                if result is None:
-                    print(" (SKIPPED or FAILED)")
-                    continue
-                
-                total_time = end_time - start_time
-                print(f" ({total_time:.6f}s)")
-                
-                update_stats(stats, result, has_reduction=bool(self.reduction_template))
-                category = extract_category(graph_file)
-                
-                # Write result line
-                line_parts = [
-                    f"{category:<12}",
-                    f"{result['file']:<35}",
-                    f"{result['vertices']:<9}",
-                    f"{result['edges']:<8}",
-                    f"{result['ursa_status']:<12}",
-                    f"{result['cliquer_status']:<12}"
-                ]
-                
-                if self.reduction_template:
-                    line_parts.append(f"{result['reduction_status']:<12}")
+            # Benchmark files concurrently; solvers run as subprocesses, so threads
+            # overlap them without pickling. Tasks carry only the graph path: the
+            # templates loaded once in main() are shared through self by reference.
+            # Results are written from this thread only, in file order: a finished
+            # file is held back until every file before it has been written, so
+            # the rows do not depend on --jobs or on which file finished first.
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                futures = {executor.submit(self._timed_benchmark_file, graph_file): index
+                           for index, graph_file in enumerate(files_to_process)}
+                finished = {}
+                next_index = 0
                 
-                line_parts.extend([
-                    f"{result['ursa_time']:<10.6f}",
-                    f"{result['cliquer_time']:<12.6f}"
-                ])
-                
-                if self.reduction_template:
-                    line_parts.append(f"{result['reduction_time']:<10.6f}")
-                
-                line_parts.extend([
-                    f"{result['ursa_clique']:<12}",
-                    f"{result['cliquer_clique']:<12}"
-                ])
-                
-                if self.reduction_template:
-                    line_parts.append(f"{result['reduction_clique']:<12}")
-                
-                if self.save_urs:
-                    urs_filename = os.path.basename(result.get('urs_file', ''))
-                    line_parts.append(f"{urs_filename:<25}")
-                    
-                    if self.reduction_template:
-                        reduction_filename = os.path.basename(result.get('reduction_file', ''))
-                        line_parts.append(f"{reduction_filename:<25}")
-                
-                f.write(" | ".join(line_parts) + "\n")
-                f.flush()
+                try:
+                    for i, future in enumerate(as_completed(futures), 1):
+                        index = futures[future]
+                        result, total_time = future.result()
+                        print(f"Testing: {os.path.basename(files_to_process[index])}, {i}/{len(files_to_process)} ...", end='')
+                        
+                        if result is None:
+                            print(" (SKIPPED or FAILED)")
+                        elif result.get('source') == 'dedup':
+                            print(f" (same graph as {result['dedup_of']})")
+                        else:
+                            print(f" ({total_time:.6f}s)")
+                        
+                        finished[index] = result
+                        while next_index in finished:
+                            result = finished.pop(next_index)
+                            if result is not None:
+                                update_stats(stats, result, has_reduction=bool(self.reduction_template))
+                                self._write_result_row(f, checkpoint, files_to_process[next_index], result)
+                            next_index += 1
+                except BaseException:
+                    # Interrupted (e.g. Ctrl-C): drop the queued files and stop the
+                    # solvers of the running ones, instead of leaving the with-block
+                    # to run every remaining file before the exception propagates
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.cancel_all()
+                    raise
             
             # Combine and write final statistics
-            combined_stats = {
-                'total': self.existing_stats['total'] + stats['total'],
-                'ursa': {k: self.existing_stats['ursa'][k] + stats['ursa'][k] for k in self.existing_stats['ursa']},
-                'cliquer': {k: self.existing_stats['cliquer'][k] + stats['cliquer'][k] for k in self.existing_stats['cliquer']},
-                'reduction': {k: self.existing_stats['reduction'][k] + stats['reduction'][k] for k in self.existing_stats['reduction']}
-            }
+            combined_stats = {'total': self.existing_stats['total'] + stats['total']}
+            for solver in ('ursa', 'cliquer', 'reduction'):
+                # Counter.update keeps zero counts, which Counter addition would drop
+                combined_stats[solver] = Counter(self.existing_stats[solver])
+                combined_stats[solver].update(stats[solver])
             
             write_final_statistics(f, combined_stats, has_reduction=bool(self.reduction_template))
         
+        self.save_lb_cache()
+        
         if self.continue_mode:
             print(f"Benchmark completed. Added {stats['total']} new results.")
             print(f"Total instances in {output_file}: {combined_stats['total']}")
@@ -687,6 +1261,8 @@ def main():
     parser = argparse.ArgumentParser(description='URSA vs Cliquer Max Clique Benchmark')
     parser.add_argument('graph_dir', nargs='?', help='Directory containing graph files (.clq, .txt)')
     parser.add_argument('--timeout', type=int, default=120, help='Timeout in seconds')
+    parser.add_argument('--hard-timeout', type=float,
+                       help='Seconds after which a solver that ignored SIGTERM is killed (default: 1.1 * timeout)')
     parser.add_argument('--output', default='cliqueK_results.txt', help='Output file')
     parser.add_argument('--single-file', help='Test single graph file instead of directory')
     parser.add_argument('--solver-template', required=True, help='Path to file containing URS solver template (REQUIRED)')
@@ -694,8 +1270,32 @@ def main():
     parser.add_argument('--save-urs', action='store_true', help='Save generated URS code to files')
     parser.add_argument('--continue', dest='continue_mode', action='store_true', 
                        help='Continue from previous run - skip already processed files and append new results')
+    parser.add_argument('--k', type=int, dest='target_k',
+                       help='Target clique size K, emitted as nK in the generated URS code (OPTIONAL)')
+    parser.add_argument('--find-max-k', action='store_true',
+                       help='Find the maximum clique size with URSA by binary search on nK, between a greedy clique and Cliquer\'s answer')
+    parser.add_argument('--skip-ursa-on-cliquer-unsat', action='store_true',
+                       help='Run Cliquer first and skip URSA when it finds no clique of size K')
+    parser.add_argument('--no-skip-ursa', dest='skip_ursa', action='store_false',
+                       help='Run URSA even when Cliquer already found a clique of size K (strict comparison)')
+    parser.add_argument('--lb-cache', default='lb_cache.json',
+                       help='File caching Cliquer maximum clique sizes across runs (default: lb_cache.json)')
+    parser.add_argument('--graph-cache', action='store_true',
+                       help='Cache parsed graphs as binary files next to the inputs and load those on later runs')
+    parser.add_argument('--dedupe', action='store_true',
+                       help='Benchmark each distinct graph once and reuse its results for duplicates under other names')
+    parser.add_argument('--jobs', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                       help='Number of graph files to benchmark in parallel (default: half the CPU cores)')
     
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.target_k is not None and args.target_k < 1:
+        parser.error("--k must be at least 1")
+    if args.hard_timeout is not None and args.hard_timeout < args.timeout:
+        parser.error("--hard-timeout must not be smaller than --timeout")
+    if args.find_max_k and args.target_k is not None:
+        parser.error("--find-max-k searches for K itself and cannot be combined with --k")
     
     # Load solver template
     try:
@@ -722,13 +1322,22 @@ def main():
         ursa_path='./ursa',
         cliquer_path='cliquer', 
         timeout=args.timeout,
+        hard_timeout=args.hard_timeout,
         solver_template=solver_template,
         reduction_template=reduction_template,
         save_urs=args.save_urs,
         urs_output_dir='cliqueK_saved_files',
         reduction_output_dir='cliqueK_reduction_saved_files',
         continue_mode=args.continue_mode,
-        output_file=args.output
+        output_file=args.output,
+        jobs=args.jobs,
+        target_k=args.target_k,
+        skip_ursa_on_cliquer_unsat=args.skip_ursa_on_cliquer_unsat,
+        skip_ursa_on_lower_bound=args.skip_ursa,
+        lb_cache_file=args.lb_cache,
+        graph_cache=args.graph_cache,
+        find_max_k=args.find_max_k,
+        dedupe=args.dedupe
     )
     
     # Run benchmark
@@ -738,6 +1347,7 @@ def main():
             benchmark.processed_files, _, _ = benchmark.load_existing_results()
         
         result = benchmark.benchmark_file(args.single_file, verbose=True)
+        benchmark.save_lb_cache()
         if result:
             print("\nResults:")
             print(f"  Vertices: {result['vertices']}, Edges: {result['edges']}")
@@ -1,12 +1,57 @@
 #!/usr/bin/env python3
 
 import os
+import mmap
 import subprocess
 import time
 import re
 from pathlib import Path
 import argparse
-from typing import Tuple, Dict, List, Set
+import threading
+import weakref
+import hashlib
+from array import array
+from itertools import chain
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Tuple, Dict, List, Set, Iterator
+
+# URSA output patterns, compiled once instead of on every solver run
+_RE_UNSAT = re.compile(r'No solutions found|\b0 solutions\b|\[Number of solutions:\s*0\]')
+_RE_NO_SOLUTIONS = re.compile(r'0 solutions|No solutions')
+
+# URSA output lines the verdict is read from; the rest of the solver log is
+# dropped as it is read, and only the last few matching lines are kept
+_RE_VERDICT_LINE = re.compile(rb'Solution|solutions|Formula size|Solving time')
+_VERDICT_LINES_KEPT = 64
+
+# Result-file patterns used when resuming: the file name column of a result
+# row (names may contain spaces; only the padding around them is dropped), and
+# the section titles and counters of the final statistics. They are bytes
+# patterns so they can scan the memory-mapped file without decoding it.
+_RE_RESULT_FILENAME = re.compile(rb'^[^|\n]*\|[ \t]*([^|\n]*?\.cnf[^|\n]*?)[ \t]*(?:\||\r?$)', re.M)
+_RE_STAT_LINE = re.compile(
+    rb'^(URSA|MiniSat|Reduction) Results:'
+    rb'|^[ \t]*(SAT|UNSAT|UNKNOWN|TIMEOUT|ERROR|Total) instances:[ \t]*(\d+)', re.M)
+_STAT_CONTEXTS = {b'URSA': 'ursa', b'MiniSat': 'minisat', b'Reduction': 'reduction'}
+
+# First characters of DIMACS lines that carry no clause or header (comments,
+# and the '%' end marker of the SATLIB benchmark files)
+_DIMACS_SKIP_CHARS = frozenset('c%')
+
+# Result rows are flushed to the output file in batches of this size; the
+# with-block still flushes on close, also when the run is interrupted
+_FLUSH_EVERY_ROWS = 8
+
+# Serializes verbose output of solvers running concurrently for the same file
+_print_lock = threading.Lock()
+
+# Solvers are started with close_fds=False, which lets CPython launch them with
+# posix_spawn instead of fork+exec (see subprocess._USE_POSIX_SPAWN). Closing
+# inherited descriptors is unnecessary: descriptors Python opens, including
+# the pipes of solvers started concurrently from other threads, are created
+# non-inheritable, so each solver only gets its own stdin/stdout/stderr.
+_CLOSE_FDS = False
 
 def is_sat_output(stdout: str) -> bool:
     """Check if URSA output indicates SAT."""
@@ -15,31 +60,45 @@ def is_sat_output(stdout: str) -> bool:
         return True
     elif "[Solving time:" in stdout and "[Formula size:" in stdout:
         # Ako ima [Solving time:] i [Formula size:] ali nema "0 solutions" ili "No solutions"
-        if "0 solutions" not in stdout and "No solutions" not in stdout:
+        if _RE_NO_SOLUTIONS.search(stdout) is None:
             return True
     return False
 
 def is_unsat_output(stdout: str) -> bool:
     """Check if URSA output indicates UNSAT."""
-    # Postojeći uzorci
-    if "No solutions found" in stdout or re.search(r'\b0 solutions\b', stdout):
-        return True
-    
-    # Novi uzorak za format "[Number of solutions: 0]"
-    if re.search(r'\[Number of solutions:\s*0\]', stdout):
-        return True
-    
-    return False
+    # Postojeći uzorci i format "[Number of solutions: 0]", u jednom prolazu
+    return _RE_UNSAT.search(stdout) is not None
+
+def collect_verdict_lines(stream, verdict_lines: deque):
+    """Read solver output to EOF, keeping only the lines that decide the verdict."""
+    with stream:
+        for line in stream:
+            if _RE_VERDICT_LINE.search(line):
+                verdict_lines.append(line.decode(errors='replace'))
+
+def formula_key(num_vars: int, num_clauses: int, clauses: List[List[int]]) -> str:
+    """Identify a formula by its header and its clauses, in file order."""
+    clauses_hash = hashlib.blake2b(array('i', map(len, clauses)).tobytes(), digest_size=16)
+    clauses_hash.update(array('i', chain.from_iterable(clauses)).tobytes())
+    return f"{num_vars}:{num_clauses}:{clauses_hash.hexdigest()}"
+
+def _iter_dimacs_files(dimacs_dir: str) -> Iterator[str]:
+    """Lazily yield paths of .cnf files under a directory, recursively."""
+    try:
+        entries = os.scandir(dimacs_dir)
+    except OSError:
+        return  # Unreadable directories are skipped, as os.walk did
+    with entries:
+        for entry in entries:
+            # The name is checked first; only other entries need a type lookup
+            if entry.name.endswith('.cnf') and not entry.is_dir():
+                yield entry.path
+            elif entry.is_dir(follow_symlinks=False):
+                yield from _iter_dimacs_files(entry.path)
 
 def find_dimacs_files(dimacs_dir: str) -> List[str]:
     """Find all DIMACS .cnf files in a directory (sorted)."""
-    dimacs_files = []
-    for root, dirs, files in os.walk(dimacs_dir):
-        for file in files:
-            if file.endswith('.cnf'):
-                dimacs_files.append(os.path.join(root, file))
-    dimacs_files.sort()
-    return dimacs_files
+    return sorted(_iter_dimacs_files(dimacs_dir))
 
 def extract_category(dimacs_file: str) -> str:
     """Extract category from parent directory name."""
@@ -143,21 +202,23 @@ def filter_files(dimacs_files: List[str], processed_files: Set[str], continue_mo
 def prepare_output_file(output_file: str, continue_mode: bool) -> str:
     """Prepare output file for writing (clear old final statistics if continuing)."""
     file_mode = "a" if continue_mode and os.path.exists(output_file) else "w"
-    if file_mode == "a":
-        with open(output_file, "r") as f:
-            existing_lines = f.readlines()
-        final_stats_index = next((i for i, line in enumerate(existing_lines) if "FINAL STATISTICS:" in line), -1)
-        if final_stats_index > 0:
-            existing_lines = existing_lines[:final_stats_index]
-        with open(output_file, "w") as f:
-            f.writelines(existing_lines)
+    if file_mode == "a" and os.path.getsize(output_file) > 0:
+        # Cut the file at the start of the FINAL STATISTICS line in place,
+        # instead of reading all lines and writing the results back
+        with open(output_file, "rb+") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                final_stats_pos = mm.find(b"FINAL STATISTICS:")
+                final_stats_offset = mm.rfind(b"\n", 0, final_stats_pos) + 1 if final_stats_pos >= 0 else 0
+            if final_stats_offset > 0:
+                f.truncate(final_stats_offset)
     return file_mode
 
 class URSASATBenchmark:
     def __init__(self, ursa_path="./ursa", minisat_path="minisat", timeout=120, 
                  solver_template=None, reduction_template=None, save_urs=False, 
                  urs_output_dir="urs_files", reduction_output_dir="reduction_files",
-                 continue_mode=False, output_file="SAT_benchmark_results.txt"):
+                 continue_mode=False, output_file="SAT_benchmark_results.txt", jobs=1,
+                 urs_code_cache=0):
         
         """Initialize URSASATBenchmark with configuration parameters."""
         self.ursa_path = ursa_path
@@ -179,6 +240,33 @@ class URSASATBenchmark:
         self.processed_files = set()
         self.existing_stats = None
         self.existing_header = None
+        self.jobs = max(1, jobs)
+        # Set by benchmark_directory; saved URS files mirror the layout below it
+        self.dimacs_dir = None
+        
+        # Encoded URS code of the last urs_code_cache formulas, keyed by
+        # (formula_key, template), so identical instances skip code generation;
+        # each formula has one entry per template
+        self.urs_code_cache = max(0, urs_code_cache)
+        self._urs_code_cache_entries = self.urs_code_cache * (2 if reduction_template else 1)
+        self._urs_code_cache = OrderedDict()
+        self._urs_code_cache_lock = threading.Lock()
+        
+        # Solver processes currently running; all of them are killed when the
+        # run is interrupted
+        self._processes = weakref.WeakSet()
+        self._processes_lock = threading.Lock()
+        self._cancelled = False
+        
+        # Result row layout, matching the columns of write_header; built once
+        # and filled by name from the result dict for every row
+        self._row_fmt = (
+            "{category:<12} | {file:<35} | {variables:<9} | {clauses:<8} | {ursa_status:<8} | {minisat_status:<8}"
+            + (" | {reduction_status:<10}" if reduction_template else "")
+            + " | {ursa_time:<10.6f} | {minisat_time:<12.6f}"
+            + (" | {reduction_time:<14.6f}" if reduction_template else "")
+            + "\n"
+        )
         
         # Create directories for URS files if they don't exist
         if self.save_urs:
@@ -197,33 +285,25 @@ class URSASATBenchmark:
         existing_stats = self._initialize_empty_stats()
         header_lines = []
         
-        if not os.path.exists(self.output_file):
+        if not os.path.exists(self.output_file) or os.path.getsize(self.output_file) == 0:
             return processed_files, existing_stats, header_lines
         
         try:
-            with open(self.output_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Find where final statistics begin
-            final_stats_index = -1
-            for i, line in enumerate(lines):
-                if "FINAL STATISTICS:" in line:
-                    final_stats_index = i
-                    break
-            
-            if final_stats_index == -1:
-                # If no final stats, all lines are data
-                data_lines = lines
-            else:
-                # Everything before final stats is data
-                data_lines = lines[:final_stats_index]
-                stats_lines = lines[final_stats_index:]
-                
-                existing_stats = self._parse_statistics_section(stats_lines)
-            
-            header_lines = self._extract_header_lines(data_lines)
-            
-            processed_files = self._extract_processed_filenames(data_lines)
+            # The file is mapped rather than read, so only the matched header,
+            # file names and counters are turned into Python objects
+            with open(self.output_file, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Result rows come before the final statistics line, the statistics after it
+                    stats_pos = mm.find(b"FINAL STATISTICS:")
+                    if stats_pos == -1:
+                        data_end = len(mm)
+                    else:
+                        data_end = mm.rfind(b"\n", 0, stats_pos) + 1
+                        existing_stats = self._parse_statistics_section(mm, data_end)
+                    
+                    header_lines = self._extract_header_lines(mm, data_end)
+                    
+                    processed_files = self._extract_processed_filenames(mm, data_end)
             
             self._print_existing_results_summary(processed_files, existing_stats)
             
@@ -243,75 +323,38 @@ class URSASATBenchmark:
             'reduction': {'SAT': 0, 'UNSAT': 0, 'TIMEOUT': 0, 'ERROR': 0, 'UNKNOWN': 0}
         }
         
-    def _extract_header_lines(self, data_lines: List[str]) -> List[str]:
-        """Extract header lines from data (until separator line)."""
-        for i, line in enumerate(data_lines):
-            if '-----' in line:
-                return data_lines[:i+1]
-        return []
+    def _extract_header_lines(self, data: bytes, data_end: int) -> List[str]:
+        """Extract header lines from data[:data_end] (until separator line)."""
+        separator = data.find(b'-----', 0, data_end)
+        if separator == -1:
+            return []
+        header_end = data.find(b'\n', separator, data_end) + 1 or data_end
+        return data[:header_end].decode().splitlines(keepends=True)
         
-    def _extract_processed_filenames(self, data_lines: List[str]) -> Set[str]:
-        """Extract processed file names from result lines."""
-        processed_files = set()
-        for line in data_lines:
-            if '|' in line and '.cnf' in line:
-                # Parse result line
-                parts = line.split('|')
-                if len(parts) >= 2:
-                    file_part = parts[1].strip()
-                    if '.cnf' in file_part:
-                        processed_files.add(file_part)
-        return processed_files
+    def _extract_processed_filenames(self, data: bytes, data_end: int) -> Set[str]:
+        """Extract processed file names from result lines in data[:data_end]."""
+        return {name.decode() for name in _RE_RESULT_FILENAME.findall(data, 0, data_end)}
         
-    def _parse_statistics_section(self, stats_lines: List[str]) -> Dict:
-        """Parse statistics from the statistics section."""
+    def _parse_statistics_section(self, data: bytes, stats_start: int) -> Dict:
+        """Parse statistics from the statistics section starting at data[stats_start]."""
         stats = self._initialize_empty_stats()
         current_context = None
         
-        for line in stats_lines:
-            line_stripped = line.strip()
-            
-            # Detect context switch
-            if "URSA Results:" in line:
-                current_context = "ursa"
-            elif "MiniSat Results:" in line:
-                current_context = "minisat"
-            elif "Reduction Results:" in line:
-                current_context = "reduction"
-            elif "Total instances:" in line:
-                try:
-                    total_str = line.split(':', 1)[1].strip()
-                    stats['total'] = int(total_str)
-                except:
-                    pass
+        # One sweep over section titles and counters; a title sets the context
+        # the counters below it belong to
+        for match in _RE_STAT_LINE.finditer(data, stats_start):
+            title, key, count = match.groups()
+            if title:
+                current_context = _STAT_CONTEXTS[title]
+                continue
+            key = key.decode()
+            if key == 'Total':
+                stats['total'] = int(count)
                 current_context = None
-            
-            # Parse statistics based on current context
-            if current_context and "instances:" in line:
-                self._parse_stat_line(stats, current_context, line)
+            elif current_context and key in stats[current_context]:
+                stats[current_context][key] = int(count)
         
         return stats
-        
-    def _parse_stat_line(self, stats: Dict, context: str, line: str):
-        """Parse a single statistics line and update the stats dictionary."""
-        try:
-            if "SAT instances:" in line:
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['SAT'] = int(num_str)
-            elif "UNSAT instances:" in line:
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['UNSAT'] = int(num_str)
-            elif "TIMEOUT instances:" in line:
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['TIMEOUT'] = int(num_str)
-            elif "ERROR instances:" in line:
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['ERROR'] = int(num_str)
-            elif "UNKNOWN instances:" in line and context in ['ursa', 'reduction']:
-                num_str = line.split(':', 1)[1].strip()
-                stats[context]['UNKNOWN'] = int(num_str)
-        except (ValueError, IndexError) as e:
-            print(f"WARNING: Could not parse line: {line.strip()}")
             
     def _print_existing_results_summary(self, processed_files: Set[str], existing_stats: Dict):
         """Print summary of loaded existing results."""
@@ -347,36 +390,41 @@ class URSASATBenchmark:
 
     def parse_dimacs(self, dimacs_content: str) -> Tuple[int, int, List[List[int]]]:
         """Parse DIMACS CNF content and return (num_vars, num_clauses, clauses)."""
-        lines = dimacs_content.strip().split('\n')
         num_vars = 0
         num_clauses = 0
         clauses = []
         
-        for line in lines:
-            line = line.strip()
+        # Each line is split once; its tokens classify the line and give the literals
+        for line in dimacs_content.splitlines():
+            tokens = line.split()
             
-            # Skip comments and empty lines
-            if not line or line.startswith('c') or line.startswith('%'):
+            # Skip empty lines; everything else is told apart by its first character
+            if not tokens:
+                continue
+            first = tokens[0][0]
+            if first in _DIMACS_SKIP_CHARS:
                 continue
                 
             # Header line
-            if line.startswith('p cnf'):
-                parts = line.split()
-                num_vars = int(parts[2])
-                num_clauses = int(parts[3])
+            if first == 'p':
+                if line.lstrip().startswith('p cnf'):
+                    num_vars = int(tokens[2])
+                    num_clauses = int(tokens[3])
                 continue
                 
-            # Clauses
-            if line and not line.startswith('p'):
-                literals = [int(x) for x in line.split() if x != '0']
-                if literals:  # Add only non-empty clauses
-                    clauses.append(literals)
+            # Clauses, one per line (DUBOIS files do not end every clause with 0)
+            literals = [int(x) for x in tokens if x != '0']
+            if literals:  # Add only non-empty clauses
+                clauses.append(literals)
                     
         return num_vars, num_clauses, clauses
 
     def generate_urs_code(self, num_vars: int, num_clauses: int, clauses: List[List[int]], template: str) -> str:
         """Generate URS code from parsed DIMACS data using the provided template."""
         # Ovo je identično kao u staroj verziji
+        # The clear loop is required: URSA treats an array element that was
+        # never assigned as a free variable rather than false, so skipping it
+        # would let the solver pick literals that are not in the clause
         urs_code = f"""nN = {num_vars};
 nClauses = {num_clauses};
 
@@ -388,62 +436,110 @@ for(ni=0; ni<nClauses; ni++) {{
 
 """
         
-        # Add each clause
+        # Text after "bC[<clause>][" for every literal, built once per variable:
+        # slot_text[v] ends positive literal v (slot 2*(v-1), DIMACS is 1-indexed)
+        # and slot_text[-v], counted from the end, ends -v (slot 2*(v-1)+1), so
+        # the signed literal indexes it directly with no sign branch per literal
+        max_var = max(num_vars, max((max(map(abs, clause)) for clause in clauses), default=0))
+        slot_text = [""] * (2 * max_var + 1)
+        for var in range(1, max_var + 1):
+            slot_text[var] = f"{2 * var - 2}]=true;"
+            slot_text[-var] = f"{2 * var - 1}]=true;"
+        
+        # One compact line per clause instead of one spaced statement per
+        # literal, so there is less text to pipe to URSA and for it to lex.
+        # The pieces are collected in a list and joined once.
+        parts = [urs_code]
+        append = parts.append
         for clause_idx, clause in enumerate(clauses):
-            for literal in clause:
-                if literal > 0:
-                    # Positive literal (1-indexed in DIMACS, 0-indexed in URSA)
-                    var_index = literal - 1  # Convert to 0-indexed
-                    urs_code += f"bC[{clause_idx}][{2 * var_index}] = true;\n"
-                else:
-                    # Negative literal (1-indexed in DIMACS, 0-indexed in URSA)  
-                    var_index = abs(literal) - 1  # Convert to 0-indexed
-                    urs_code += f"bC[{clause_idx}][{2 * var_index + 1}] = true;\n"
+            if clause:
+                clause_prefix = f"bC[{clause_idx}]["
+                append(clause_prefix + clause_prefix.join([slot_text[literal] for literal in clause]) + "\n")
         
         # Add template logic
-        urs_code += "\n" + template + "\n"
+        parts.append("\n" + template + "\n")
+        urs_code = "".join(parts)
         return urs_code
 
-    def save_urs_code(self, urs_code: str, original_filename: str, output_dir: str, suffix: str = "") -> str:
+    def save_urs_code(self, urs_code: bytes, original_filename: str, output_dir: str, suffix: str = "") -> str:
         """Save the generated URS code to a file and return the file path."""
-        # Generate the filename based on the original DIMACS file
-        base_name = Path(original_filename).stem
+        # Generate the filename based on the original DIMACS file; its directory
+        # relative to the benchmark directory is kept, so files with the same
+        # name in different categories never share a path (URSA reads its
+        # input back from this file while other jobs keep saving theirs)
+        base_name = Path(original_filename).with_suffix('')
         urs_filename = f"{base_name}{suffix}.urs"
         urs_filepath = os.path.join(output_dir, urs_filename)
         
         try:
-            with open(urs_filepath, 'w') as f:
+            os.makedirs(os.path.dirname(urs_filepath), exist_ok=True)
+            with open(urs_filepath, 'wb') as f:
                 f.write(urs_code)
             return urs_filepath
         except Exception as e:
             print(f"Error saving URS code to {urs_filepath}: {e}")
             return None
     
-    def run_ursa(self, urs_code: str, debug_name: str = "") -> Tuple[str, float]:
+    def _start_solver(self, args: List[str], **popen_kwargs) -> subprocess.Popen:
+        """Start a solver process that cancel_all can kill."""
+        process = subprocess.Popen(args, close_fds=_CLOSE_FDS, **popen_kwargs)
+        with self._processes_lock:
+            self._processes.add(process)
+            if self._cancelled:
+                process.kill()
+        return process
+
+    def cancel_all(self):
+        """Kill every running solver and make solvers started later stop at once."""
+        with self._processes_lock:
+            self._cancelled = True
+            for process in self._processes:
+                process.kill()
+
+    def run_ursa(self, urs_code: bytes, debug_name: str = "", urs_filepath: str = None) -> Tuple[str, float]:
         """
         Run URSA with a given URS code with timeout and memory limit.
         Python process stays alive even if URSA exceeds memory limit.
+        If the code was already saved to urs_filepath, URSA reads it from there.
+        Every call starts a new URSA process: URSA reads one program up to EOF
+        of stdin and only then solves it, so it cannot be kept alive and fed
+        several programs.
         """
 
         try:
-            start_time = time.time()
-            process = subprocess.Popen(
-                [self.ursa_path, "-q", "-l32"], 
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
+            # Monotonic, high-resolution clock; converted to seconds only for the result
+            start_ns = time.perf_counter_ns()
+            # A saved file is handed to URSA as stdin, so the code is not piped through Python again
+            stdin = open(urs_filepath, 'rb') if urs_filepath else subprocess.PIPE
+            try:
+                process = self._start_solver(
+                    [self.ursa_path, "-q", "-l32"], 
+                    stdin=stdin,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+            finally:
+                if urs_filepath:
+                    stdin.close()
             
+            # stdout is read by a filtering thread instead of being buffered whole;
+            # communicate() still feeds stdin and drains stderr
+            verdict_lines = deque(maxlen=_VERDICT_LINES_KEPT)
+            stdout_pipe, process.stdout = process.stdout, None
+            reader = threading.Thread(target=collect_verdict_lines, args=(stdout_pipe, verdict_lines), daemon=True)
+            reader.start()
+
             try:
-                stdout, stderr = process.communicate(input=urs_code, timeout=self.timeout)
+                process.communicate(input=None if urs_filepath else urs_code, timeout=self.timeout)
             except subprocess.TimeoutExpired:
                 process.kill()
-                stdout, stderr = process.communicate()
+                process.communicate()
+                reader.join()
                 return "TIMEOUT", self.timeout
+            reader.join()
 
-            end_time = time.time()
-            actual_elapsed = end_time - start_time
+            actual_elapsed = (time.perf_counter_ns() - start_ns) / 1e9
+            stdout = "".join(verdict_lines)
 
             if process.returncode == 0:
                 if is_sat_output(stdout):
@@ -462,23 +558,22 @@ for(ni=0; ni<nClauses; ni++) {{
     def run_minisat(self, dimacs_file: str) -> Tuple[str, float]:
         """Run MiniSat on a DIMACS file and return (status, elapsed_time)."""
         try:
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             
-            process = subprocess.Popen(
+            process = self._start_solver(
                 [self.minisat_path, dimacs_file, "/dev/null"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             )
             
+            # Only the exit code is used, so MiniSat's log is discarded unread
             try:
-                stdout, stderr = process.communicate(timeout=self.timeout)
+                process.communicate(timeout=self.timeout)
             except subprocess.TimeoutExpired:
                 process.kill()
                 return "TIMEOUT", self.timeout
                 
-            end_time = time.time()
-            elapsed_time = end_time - start_time
+            elapsed_time = (time.perf_counter_ns() - start_ns) / 1e9
             
             # MiniSat exit codes: 10=SAT, 20=UNSAT
             if process.returncode == 10:
@@ -498,23 +593,51 @@ for(ni=0; ni<nClauses; ni++) {{
             dimacs_content = f.read()
         return self.parse_dimacs(dimacs_content)
 
+    def encoded_urs_code(self, num_vars: int, num_clauses: int, clauses: List[List[int]],
+        template: str, key: str = None) -> bytes:
+        """
+        Return the encoded URS code for a formula, reusing the cached bytes of an
+        identical formula when the code cache is enabled and key is given.
+        """
+        if not (self.urs_code_cache and key):
+            return self.generate_urs_code(num_vars, num_clauses, clauses, template).encode()
+
+        cache_key = (key, template)
+        with self._urs_code_cache_lock:
+            urs_code = self._urs_code_cache.get(cache_key)
+            if urs_code is not None:
+                self._urs_code_cache.move_to_end(cache_key)
+                return urs_code
+
+        urs_code = self.generate_urs_code(num_vars, num_clauses, clauses, template).encode()
+        with self._urs_code_cache_lock:
+            self._urs_code_cache[cache_key] = urs_code
+            if len(self._urs_code_cache) > self._urs_code_cache_entries:
+                self._urs_code_cache.popitem(last=False)
+        return urs_code
+
     def run_with_template(self, num_vars: int, num_clauses: int, clauses: List[List[int]],
         template: str, save_dir: str = None, suffix: str = "",
-        label: str = "URSA", verbose: bool = False, original_filename: str = None) -> Tuple[str, float]:
+        label: str = "URSA", verbose: bool = False, original_filename: str = None,
+        key: str = None) -> Tuple[str, float]:
         """
         Generate URS code from DIMACS data, optionally save it, run URSA solver,
         and return (status, elapsed_time).
         """
-        urs_code = self.generate_urs_code(num_vars, num_clauses, clauses, template)
+        # Encoded once; the same bytes are saved and fed to URSA
+        urs_code = self.encoded_urs_code(num_vars, num_clauses, clauses, template, key)
 
+        filepath = None
         if save_dir and original_filename:
             filepath = self.save_urs_code(urs_code, original_filename, save_dir, suffix)
             if filepath and verbose:
-                print(f"{label} code saved to: {filepath}")
+                with _print_lock:
+                    print(f"{label} code saved to: {filepath}")
 
-        status, elapsed = self.run_ursa(urs_code, label if verbose else "")
+        status, elapsed = self.run_ursa(urs_code, label if verbose else "", filepath)
         if verbose:
-            print(f"{label}: {status} ({elapsed:.6f}s)")
+            with _print_lock:
+                print(f"{label}: {status} ({elapsed:.6f}s)")
 
         return status, elapsed
     
@@ -531,6 +654,9 @@ for(ni=0; ni<nClauses; ni++) {{
         if verbose:
             print(f"Testing: {file_name}")
 
+        # Saved URS files are named after the file's path below the benchmark directory
+        urs_name = os.path.relpath(dimacs_file, self.dimacs_dir) if self.dimacs_dir else file_name
+
         # Parse DIMACS file
         try:
             num_vars, num_clauses, clauses = self.parse_and_generate(dimacs_file)
@@ -541,20 +667,43 @@ for(ni=0; ni<nClauses; ni++) {{
                 print(f"Error parsing {dimacs_file}: {e}")
             return None
 
-        # Run URSA
-        ursa_status, ursa_time = self.run_with_template(
-            num_vars, num_clauses, clauses,
-            template=self.solver_template,
-            save_dir=self.urs_output_dir if self.save_urs else None,
-            label="URSA",
-            verbose=verbose,
-            original_filename=file_name
-        )
+        # Hashed once per file and shared by the solver and reduction templates
+        key = formula_key(num_vars, num_clauses, clauses) if self.urs_code_cache else None
+
+        # Run URSA, MiniSat and the optional reduction side by side, so the
+        # wall time per file is the slowest solver instead of their sum
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            ursa_future = executor.submit(
+                self.run_with_template,
+                num_vars, num_clauses, clauses,
+                template=self.solver_template,
+                save_dir=self.urs_output_dir if self.save_urs else None,
+                label="URSA",
+                verbose=verbose,
+                original_filename=urs_name,
+                key=key
+            )
+            minisat_future = executor.submit(self.run_minisat, dimacs_file)
+            reduction_future = None
+            if self.reduction_template:
+                reduction_future = executor.submit(
+                    self.run_with_template,
+                    num_vars, num_clauses, clauses,
+                    template=self.reduction_template,
+                    save_dir=self.reduction_output_dir if self.save_urs else None,
+                    suffix="_reduction",
+                    label="Reduction",
+                    verbose=verbose,
+                    original_filename=urs_name,
+                    key=key
+                )
+
+            ursa_status, ursa_time = ursa_future.result()
+            minisat_status, minisat_time = minisat_future.result()
 
-        # Run MiniSat
-        minisat_status, minisat_time = self.run_minisat(dimacs_file)
         if verbose:
-            print(f"MiniSat: {minisat_status} ({minisat_time:.6f}s)")
+            with _print_lock:
+                print(f"MiniSat: {minisat_status} ({minisat_time:.6f}s)")
 
         result = {
             "file": file_name,
@@ -566,28 +715,25 @@ for(ni=0; ni<nClauses; ni++) {{
             "minisat_time": minisat_time,
         }
 
-        # Run URSA Reduction if template provided
-        if self.reduction_template:
-            reduction_status, reduction_time = self.run_with_template(
-                num_vars, num_clauses, clauses,
-                template=self.reduction_template,
-                save_dir=self.reduction_output_dir if self.save_urs else None,
-                suffix="_reduction",
-                label="Reduction",
-                verbose=verbose,
-                original_filename=file_name
-            )
+        if reduction_future is not None:
+            reduction_status, reduction_time = reduction_future.result()
             result["reduction_status"] = reduction_status
             result["reduction_time"] = reduction_time
 
         return result
 
+    def _timed_benchmark_file(self, dimacs_file: str) -> Tuple[Dict[str, any], float]:
+        """Benchmark a single DIMACS file quietly and return (result, wall_time)."""
+        start_ns = time.perf_counter_ns()
+        result = self.benchmark_file(dimacs_file, verbose=False)
+        return result, (time.perf_counter_ns() - start_ns) / 1e9
 
     def benchmark_directory(self, dimacs_dir: str, output_file: str = "SAT_benchmark_results.txt"):
         """Benchmark all .cnf files in a directory, with support for continue mode."""
 
         self.processed_files, self.existing_stats, self.existing_header = self.load_or_init_stats()
 
+        self.dimacs_dir = dimacs_dir
         dimacs_files = find_dimacs_files(dimacs_dir)
         print(f"Found {len(dimacs_files)} DIMACS files")
 
@@ -599,52 +745,54 @@ for(ni=0; ni<nClauses; ni++) {{
         file_mode = prepare_output_file(output_file, self.continue_mode)
 
         # --- Processing ---
-        with open(output_file, file_mode) as f:
+        with open(output_file, file_mode, buffering=1 << 16) as f:
             if file_mode == "w":
                 solver_name = "solver_template"
                 reduction_name = "reduction_template" if self.reduction_template else None
                 write_header(f, solver_name, reduction_name, self.save_urs)
 
-            for i, dimacs_file in enumerate(files_to_process, 1):
-                # benchmark single file
-                print(f"Testing: {os.path.basename(dimacs_file)}, {i}/{len(files_to_process)} ...", end="", flush=True)
-                start_time = time.time()
-                result = self.benchmark_file(dimacs_file, verbose=False)
-                end_time = time.time()
-
-                if result is None:
-                    print(" (SKIPPED or FAILED)")
-                    continue
-
-                total_time = end_time - start_time
-                print(f" ({total_time:.6f}s)")
-
-                update_stats(stats, result, has_reduction=bool(self.reduction_template))
-                category = extract_category(dimacs_file)
-
-                line_parts = [
-                    f"{category:<12}",
-                    f"{result['file']:<35}",
-                    f"{result['variables']:<9}",
-                    f"{result['clauses']:<8}",
-                    f"{result['ursa_status']:<8}",
-                    f"{result['minisat_status']:<8}",
-                ]
-
-                if self.reduction_template:
-                    line_parts.append(f"{result['reduction_status']:<10}")
-
-                line_parts.extend([
-                    f"{result['ursa_time']:<10.6f}",
-                    f"{result['minisat_time']:<12.6f}"
-                ])
-                
-                if self.reduction_template:
-                    line_parts.append(f"{result['reduction_time']:<14.6f}")
-                    
-                
-                f.write(" | ".join(line_parts) + "\n")
-                f.flush()
+            # Benchmark files concurrently; URSA and MiniSat run as subprocesses,
+            # so threads overlap them without pickling. Results are written from
+            # this thread only, in file order: a finished file is held back until
+            # every file before it has been written, so the rows do not depend on
+            # --jobs or on which file finished first.
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                futures = {executor.submit(self._timed_benchmark_file, dimacs_file): index
+                           for index, dimacs_file in enumerate(files_to_process)}
+                finished = {}
+                next_index = 0
+
+                rows_written = 0
+                try:
+                    for i, future in enumerate(as_completed(futures), 1):
+                        index = futures[future]
+                        result, total_time = future.result()
+                        print(f"Testing: {os.path.basename(files_to_process[index])}, {i}/{len(files_to_process)} ...", end="", flush=True)
+
+                        if result is None:
+                            print(" (SKIPPED or FAILED)")
+                        else:
+                            print(f" ({total_time:.6f}s)")
+
+                        finished[index] = result
+                        while next_index in finished:
+                            result = finished.pop(next_index)
+                            if result is not None:
+                                update_stats(stats, result, has_reduction=bool(self.reduction_template))
+                                category = extract_category(files_to_process[next_index])
+
+                                f.write(self._row_fmt.format(category=category, **result))
+                                rows_written += 1
+                                if rows_written % _FLUSH_EVERY_ROWS == 0:
+                                    f.flush()
+                            next_index += 1
+                except BaseException:
+                    # Interrupted (e.g. Ctrl-C): drop the queued files and kill the
+                    # solvers of the running ones, instead of leaving the with-block
+                    # to run every remaining file before the exception propagates
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.cancel_all()
+                    raise
 
             # merge and write stats
             combined_stats = {
@@ -675,8 +823,16 @@ def main():
     parser.add_argument("--save-urs", action="store_true", help="Save generated URS code to files")
     parser.add_argument("--continue", dest="continue_mode", action="store_true",
                         help="Continue from previous run - skip already processed files and append new results")
+    parser.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Number of DIMACS files to benchmark in parallel (default: half the CPU cores)")
+    parser.add_argument("--urs-code-cache", type=int, default=0, metavar="SIZE",
+                        help="Reuse generated URS code for up to SIZE recent formulas identical to an earlier one (default: 0, off)")
 
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.urs_code_cache < 0:
+        parser.error("--urs-code-cache must not be negative")
 
     # Učitavanje solver template-a
     try:
@@ -710,6 +866,8 @@ def main():
         reduction_output_dir="SAT_reduction_saved_files",
         continue_mode=args.continue_mode,
         output_file=args.output,
+        jobs=args.jobs,
+        urs_code_cache=args.urs_code_cache,
     )
 
     # Pokretanje benchmark-a
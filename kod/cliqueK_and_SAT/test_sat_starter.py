@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sat_starter import URSASATBenchmark, filter_files, update_stats, write_final_statistics, write_header
+
+
+class ResumeTest(unittest.TestCase):
+    """Resuming a run with --continue skips the files already in the results file."""
+
+    def _write_results(self, path, benchmark, file_names):
+        stats = benchmark._initialize_empty_stats()
+        with open(path, 'w') as f:
+            write_header(f, "solver_template")
+            for file_name in file_names:
+                result = {
+                    'file': file_name, 'variables': 3, 'clauses': 2,
+                    'ursa_status': 'SAT', 'minisat_status': 'SAT',
+                    'ursa_time': 0.1, 'minisat_time': 0.01,
+                }
+                update_stats(stats, result)
+                f.write(benchmark._row_fmt.format(category='UF', **result))
+            write_final_statistics(f, stats)
+
+    def test_processed_file_names_with_spaces(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_file = os.path.join(tmp, "results.txt")
+            benchmark = URSASATBenchmark(solver_template="", continue_mode=True, output_file=output_file)
+            self._write_results(output_file, benchmark, ["a.cnf", "b c.cnf", "uf 20 - 01.cnf"])
+
+            processed_files, existing_stats, header_lines = benchmark.load_existing_results()
+
+            self.assertEqual(processed_files, {"a.cnf", "b c.cnf", "uf 20 - 01.cnf"})
+            self.assertEqual(existing_stats['total'], 3)
+            self.assertTrue(header_lines)
+            remaining = filter_files([os.path.join(tmp, "UF", name) for name in ("a.cnf", "b c.cnf", "d.cnf")],
+                                     processed_files, continue_mode=True)
+            self.assertEqual([os.path.basename(path) for path in remaining], ["d.cnf"])
+
+
+if __name__ == '__main__':
+    unittest.main()